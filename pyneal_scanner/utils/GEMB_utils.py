@@ -107,10 +107,10 @@ class GE_DirStructure():
             currentTime = int(time.time())
             for s in seriesDirs:
                 # get the info from this series dir
-                dirName = s[0].split('/')[-1]
+                dirName = os.path.basename(s[0])
 
                 # calculate & format directory size
-                dirSize = sum([os.path.getsize(join(s[0], f)) for f in os.listdir(s[0])])
+                dirSize = sum(entry.stat().st_size for entry in os.scandir(s[0]) if entry.is_file())
                 if dirSize < 1000:
                     size_string = '{:5.1f} bytes'.format(dirSize)
                 elif 1000 <= dirSize < 1000000:
@@ -146,12 +146,10 @@ class GE_DirStructure():
                 [[subDir_path, subDir_modTime]]
 
         """
-        subDirs = [join(parentDir, d) for d in os.listdir(parentDir) if os.path.isdir(join(parentDir, d))]
+        # scandir entries carry the file type, so only the dirs need a stat call
+        subDirs = [[entry.path, entry.stat().st_mtime] for entry in os.scandir(parentDir) if entry.is_dir()]
         if not subDirs:
             subDirs = None
-        else:
-            # add the modify time for each directory
-            subDirs = [[path, os.stat(path).st_mtime] for path in subDirs]
 
         # return the subdirectories
         return subDirs
@@ -177,16 +175,13 @@ class GE_DirStructure():
         startTime = int(time.time())    # tag the start time
         keepWaiting = True
         while keepWaiting:
-            # obtain a list of all directories in sessionDir
-            childDirs = [join(self.sessionDir, d) for d in os.listdir(self.sessionDir) if os.path.isdir(join(self.sessionDir, d))]
-
-            # loop through all dirs, check modification time
-            for thisDir in childDirs:
-                thisDir_mTime = os.path.getmtime(thisDir)
-                if thisDir_mTime > startTime:
-                    seriesDir = thisDir
-                    keepWaiting = False
-                    break
+            # loop through all dirs in sessionDir, check modification time
+            with os.scandir(self.sessionDir) as entries:
+                for entry in entries:
+                    if entry.is_dir() and entry.stat().st_mtime > startTime:
+                        seriesDir = entry.path
+                        keepWaiting = False
+                        break
 
             # pause before searching directories again
             time.sleep(interval)
@@ -213,7 +208,7 @@ class GE_DirStructure():
             # extract just the dirname from subDirs and append to a list
             self.seriesDirs = []
             for d in subDirs:
-                self.seriesDirs.append(d[0].split('/')[-1])
+                self.seriesDirs.append(os.path.basename(d[0]))
         else:
             self.seriesDirs = None
 
@@ -505,7 +500,7 @@ class GE_BuildNifti():
         voxTranslations = self.firstSlice_IPP * np.array([-1, -1, 1])
 
         ### Assemble the affine matrix
-        affine = np.matrix([
+        affine = np.array([
             [rowAxis_orient[0] * voxSize_row, colAxis_orient[0] * voxSize_col, slAxis_orient[0], voxTranslations[0]],
             [rowAxis_orient[1] * voxSize_row, colAxis_orient[1] * voxSize_col, slAxis_orient[1], voxTranslations[1]],
             [rowAxis_orient[2] * voxSize_row, colAxis_orient[2] * voxSize_col, slAxis_orient[2], voxTranslations[2]],
@@ -901,7 +896,7 @@ class GE_processSlice(Thread):
         voxTranslations = self.firstSlice_IPP * np.array([-1, -1, 1])
 
         ### Assemble the affine matrix
-        self.affine = np.matrix([
+        self.affine = np.array([
             [rowAxis_orient[0] * voxSize_row, colAxis_orient[0] * voxSize_col, slAxis_orient[0], voxTranslations[0]],
             [rowAxis_orient[1] * voxSize_row, colAxis_orient[1] * voxSize_col, slAxis_orient[1], voxTranslations[1]],
             [rowAxis_orient[2] * voxSize_row, colAxis_orient[2] * voxSize_col, slAxis_orient[2], voxTranslations[2]],
@@ -10,7 +10,6 @@ import sys
 import time
 import re
 import fnmatch
-import glob
 import json
 import logging
 from threading import Thread
@@ -88,12 +87,12 @@ class Philips_DirStructure():
             currentTime = int(time.time())
             for s in seriesDirs:
                 # get the info from this series dir
-                dirName = s[0].split('/')[-1]
+                dirName = os.path.basename(s[0])
 
                 # add to self.seriesDirs
 
                 # calculate & format directory size
-                dirSize = sum([os.path.getsize(join(s[0], f)) for f in os.listdir(s[0])])
+                dirSize = sum(entry.stat().st_size for entry in os.scandir(s[0]) if entry.is_file())
                 if dirSize < 1000:
                     size_string = '{:5.1f} bytes'.format(dirSize)
                 elif 1000 <= dirSize < 1000000:
@@ -129,12 +128,10 @@ class Philips_DirStructure():
                 [[subDir_path, subDir_modTime]]
 
         """
-        subDirs = [join(parentDir, d) for d in os.listdir(parentDir) if os.path.isdir(join(parentDir, d))]
+        # scandir entries carry the file type, so only the dirs need a stat call
+        subDirs = [[entry.path, entry.stat().st_mtime] for entry in os.scandir(parentDir) if entry.is_dir()]
         if not subDirs:
             subDirs = None
-        else:
-            # add the modify time for each directory
-            subDirs = [[path, os.stat(path).st_mtime] for path in subDirs]
 
         # return the subdirectories
         return subDirs
@@ -160,16 +157,14 @@ class Philips_DirStructure():
         startTime = int(time.time())    # tag the start time
         keepWaiting = True
         while keepWaiting:
-            # obtain a list of all directories in sessionDir that start with '0'
-            childDirs = glob.glob(join(self.sessionDir, '0*'))
-
-            # loop through all dirs, check modification time
-            for thisDir in childDirs:
-                thisDir_mTime = os.path.getmtime(thisDir)
-                if thisDir_mTime > startTime:
-                    seriesDir = thisDir
-                    keepWaiting = False
-                    break
+            # loop through all dirs in sessionDir that start with '0', check
+            # modification time
+            with os.scandir(self.sessionDir) as entries:
+                for entry in entries:
+                    if entry.name.startswith('0') and entry.stat().st_mtime > startTime:
+                        seriesDir = entry.path
+                        keepWaiting = False
+                        break
 
             # pause before searching directories again
             time.sleep(interval)
@@ -196,7 +191,7 @@ class Philips_DirStructure():
             # extract just the dirname from subDirs and append to a list
             self.seriesDirs = []
             for d in subDirs:
-                self.seriesDirs.append(d[0].split('/')[-1])
+                self.seriesDirs.append(os.path.basename(d[0]))
         else:
             self.seriesDirs = None
 
@@ -12,8 +12,10 @@ import re
 import json
 import glob
 import logging
+from collections import deque
 from threading import Thread
-from queue import Queue
+from queue import Queue, Empty, Full
+from concurrent.futures import ThreadPoolExecutor
 
 import numpy as np
 import pydicom
@@ -22,11 +24,158 @@ from nibabel.nicom import dicomreaders
 import zmq
 
 # regEx for Siemens style file naming
-Siemens_filePattern = re.compile('\d{3}_\d{6}_\d{6}.dcm')
+Siemens_filePattern = re.compile(r'\d{3}_\d{6}_\d{6}\.dcm')
 
-# regEx for pulling the volume field out of the mosaic file name
-Siemens_mosaicVolumeNumberField = re.compile('(?<=\d{6}_)\d{6}')
-Siemens_mosaicSeriesNumberField = re.compile('(?<=\d{3}_)\d{6}(?=_\d{6}.dcm)')
+# mosaic file names are fixed width ([session#]_[series#]_[vol#].dcm), so
+# the series and volume fields can be pulled out of the name by position
+Siemens_mosaicSeriesNumberField = slice(4, 10)
+Siemens_mosaicVolumeNumberField = slice(11, 17)
+
+
+def _getPixelArray(dcm):
+    """ Return the pixel data from a dicom object as a 2D numpy array
+
+    Siemens writes out images as uncompressed, little endian, 16-bit data. For
+    images like that, the pixel bytes can be viewed directly as an array,
+    which skips the overhead of going through pydicom's pixel data handlers.
+    Any other type of image falls back to using `dcm.pixel_array`
+
+    Parameters
+    ----------
+    dcm : object
+        pydicom dataset for the image, read with pixel data included
+
+    Returns
+    -------
+    numpy array
+        2D array of pixel data, ordered [rows, cols]
+
+    """
+    transferSyntax = dcm.file_meta.get('TransferSyntaxUID')
+    if (transferSyntax is not None
+            and transferSyntax.is_little_endian
+            and not transferSyntax.is_compressed
+            and dcm.BitsAllocated == 16
+            and dcm.get('SamplesPerPixel', 1) == 1):
+        dtype = '<i2' if dcm.PixelRepresentation == 1 else '<u2'
+        return np.frombuffer(dcm.PixelData, dtype=dtype).reshape(dcm.Rows, dcm.Columns)
+    else:
+        return dcm.pixel_array
+
+
+def _demosaic(mosaic, sliceDims, nSlices):
+    """ Split a 2D mosaic image into a 3D array of slices
+
+    Siemens mosaic images store all of the slices for a single volume as tiles
+    placed side-by-side in a regular grid. Since every tile is the same size,
+    the whole mosaic can be split apart with a single reshape/transpose rather
+    than pulling out each slice one at a time.
+
+    Parameters
+    ----------
+    mosaic : numpy array
+        2D mosaic image, ordered [rows, cols]
+    sliceDims : tuple
+        (rows, cols) dimensions of a single slice within the mosaic
+    nSlices : int
+        number of slices in the volume. Any tiles in the grid beyond this
+        number are empty, and get dropped
+
+    Returns
+    -------
+    numpy array
+        3D array of slices, ordered [rows, cols, slices]
+
+    """
+    sliceRows, sliceCols = sliceDims
+    gridRows = mosaic.shape[0] // sliceRows
+    gridCols = mosaic.shape[1] // sliceCols
+
+    # split into [gridRow, sliceRow, gridCol, sliceCol], then bring the grid
+    # axes to the end so that tiles are ordered across each row of the grid
+    tiles = mosaic.reshape(gridRows, sliceRows, gridCols, sliceCols)
+    tiles = tiles.transpose(1, 3, 0, 2).reshape(sliceRows, sliceCols, gridRows * gridCols)
+
+    return tiles[:, :, :nSlices]
+
+
+def _getRescale(dcm):
+    """ Return the rescale slope and intercept from a dicom object
+
+    Parameters
+    ----------
+    dcm : object
+        pydicom dataset for the image
+
+    Returns
+    -------
+    tuple
+        (slope, intercept) as floats. Defaults to (1.0, 0.0) for images that
+        don't have the RescaleSlope/RescaleIntercept tags
+
+    """
+    return float(dcm.get('RescaleSlope', 1)), float(dcm.get('RescaleIntercept', 0))
+
+
+def _applyRescale(data, slope, intercept):
+    """ Scale raw pixel values the same way nibabel's `mosaic_to_nii` does
+
+    Unscaled data (slope of 1, intercept of 0) is returned untouched, in its
+    native dtype. Otherwise, the scaled values are returned as floats
+
+    Parameters
+    ----------
+    data : numpy array
+        raw pixel values
+    slope : float
+        RescaleSlope for the image
+    intercept : float
+        RescaleIntercept for the image
+
+    Returns
+    -------
+    numpy array
+        scaled pixel values
+
+    """
+    if slope != 1:
+        data = data * slope
+    if intercept != 0:
+        data = data + intercept
+    return data
+
+
+def _readDicoms(dicomFiles):
+    """ Read dicom files in parallel, yielding the datasets in order
+
+    Reading is mostly waiting on disk, so the files are read by a pool of
+    threads. Only as many reads as there are threads are submitted at a time,
+    so that a large series never has more than a handful of parsed datasets
+    in memory at once
+
+    Parameters
+    ----------
+    dicomFiles : list
+        list of full paths to the dicom files to read
+
+    Yields
+    ------
+    object
+        pydicom dataset for each file, in the same order as `dicomFiles`
+
+    """
+    # same number of threads that ThreadPoolExecutor defaults to
+    nWorkers = min(32, (os.cpu_count() or 1) + 4)
+    with ThreadPoolExecutor(max_workers=nWorkers) as executor:
+        pending = deque()
+        for dicomFile in dicomFiles:
+            # wait on the oldest read once the window is full
+            if len(pending) == nWorkers:
+                yield pending.popleft().result()
+            pending.append(executor.submit(pydicom.dcmread, dicomFile))
+
+        while pending:
+            yield pending.popleft().result()
 
 
 class Siemens_DirStructure():
@@ -96,15 +245,23 @@ class Siemens_DirStructure():
         if len(self.uniqueSeries) == 0:
             print('No mosaic files found in {}'.format(self.sessionDir))
         else:
+            # group the mosaic files found above by series number, rather
+            # than searching the sessionDir again for each series
+            seriesDicoms = {}
+            for f in self.allMosaics:
+                seriesDicoms.setdefault(f[Siemens_mosaicSeriesNumberField], []).append(f)
+
             # print out info on each unique series in sessionDir
             currentTime = int(time.time())
             print('Unique Series: ')
             for series in sorted(self.uniqueSeries):
                 # get list of all dicoms that match this series number
-                thisSeriesDicoms = glob.glob(join(self.sessionDir, ('*_' + series + '_*.dcm')))
+                thisSeriesDicoms = seriesDicoms[series]
 
-                # get time since last modification for last dicom in list
-                lastModifiedTime = os.stat(thisSeriesDicoms[-1]).st_mtime
+                # get time since last modification for the last dicom in the
+                # series (the file names are fixed-width, so the last volume
+                # sorts last)
+                lastModifiedTime = os.stat(join(self.sessionDir, max(thisSeriesDicoms))).st_mtime
                 timeElapsed = currentTime - lastModifiedTime
                 m, s = divmod(timeElapsed, 60)
                 time_string = '{} min, {} s ago'.format(int(m), int(s))
@@ -117,12 +274,12 @@ class Siemens_DirStructure():
 
         """
         uniqueSeries = []
-        self.allMosaics = [f for f in os.listdir(self.sessionDir) if Siemens_filePattern.match(f)]
+        self.allMosaics = [f for f in os.listdir(self.sessionDir) if Siemens_filePattern.fullmatch(f)]
         if len(self.allMosaics) > 0:
             # find unique series numbers among all mosaics
             seriesNums = []
             for f in self.allMosaics:
-                seriesNums.append(Siemens_mosaicSeriesNumberField.search(f).group())
+                seriesNums.append(f[Siemens_mosaicSeriesNumberField])
             uniqueSeries = set(seriesNums)
 
         return uniqueSeries
@@ -233,46 +390,50 @@ class Siemens_BuildNifti():
         nibabel.nifti1.Nifti1Image()
 
         """
-        # read the first dicom in the list to get overall image dimensions
-        dcm = pydicom.dcmread(join(self.seriesDir, dicomFiles[0]), stop_before_pixels=1)
+        # Use the InstanceNumber tag to order the slices. This works for anat
+        # 3D images only, since the instance numbers do not repeat as they would
+        # with functional data with multiple volumes. Each file is only read
+        # once (in parallel, see _readDicoms()); the dicom objects are kept so
+        # they can be reused below
+        sliceDict = {}
+        for dcm in _readDicoms([join(self.seriesDir, s) for s in dicomFiles]):
+            sliceDict[dcm.InstanceNumber] = dcm
+
+        # get overall image dimensions from the slices that were just read
+        # (these are the same for every slice in the series)
         sliceDims = (getattr(dcm, 'Columns'), getattr(dcm, 'Rows'))
         self.nSlicesPerVol = len(dicomFiles)
         sliceThickness = getattr(dcm, 'SliceThickness')
 
         ### Build 3D array of voxel data
-        # create an empty array to store the slice data
-        imageMatrix = np.zeros(shape=(
-                               sliceDims[0],
+        # create an empty array to store the slice data. Every slice gets
+        # written below, so there's no need to zero it out first. Slices are
+        # stored along the first axis so that each one is written as a single
+        # contiguous block; the axes are reordered to [cols, rows, slices] below
+        imageMatrix = np.empty(shape=(
+                               self.nSlicesPerVol,
                                sliceDims[1],
-                               self.nSlicesPerVol), dtype='int16')
-
-        # Use the InstanceNumber tag to order the slices. This works for anat
-        # 3D images only, since the instance numbers do not repeat as they would
-        # with functional data with multiple volumes
-        sliceDict = {}
-        for s in dicomFiles:
-            dcm = pydicom.dcmread(join(self.seriesDir, s))
-            sliceDict[dcm.InstanceNumber] = join(self.seriesDir, s)
+                               sliceDims[0]), dtype='int16')
 
         # sort by InStackPositionNumber and assemble the image
-        for sliceIdx, ISPN in enumerate(sorted(sliceDict.keys())):
-            dcm = pydicom.dcmread(sliceDict[ISPN])
+        sortedSlices = sorted(sliceDict.keys())
+        for sliceIdx, ISPN in enumerate(sortedSlices):
+            dcm = sliceDict[ISPN]
 
-            # extract the pixel data as a numpy array. Transpose
-            # so that the axes order go [cols, rows]
-            pixel_array = dcm.pixel_array.T
+            # extract the pixel data as a numpy array and place in the
+            # image matrix
+            imageMatrix[sliceIdx] = _getPixelArray(dcm)
 
-            # place in the image matrix
-            imageMatrix[:, :, sliceIdx] = pixel_array
+        # transpose so that the axes order go [cols, rows, slices]. This is
+        # just a view, and its memory layout (Fortran order) is the one that
+        # nifti files are written in
+        imageMatrix = imageMatrix.T
 
         ### create the affine transformation to map from vox to mm space
         # in order to do this, we need to get some values from the first and
         # last slices in the volume.
-        firstSlice = sliceDict[sorted(sliceDict.keys())[0]]
-        lastSlice = sliceDict[sorted(sliceDict.keys())[-1]]
-
-        dcm_first = pydicom.dcmread(firstSlice)
-        dcm_last = pydicom.dcmread(lastSlice)
+        dcm_first = sliceDict[sortedSlices[0]]
+        dcm_last = sliceDict[sortedSlices[-1]]
         self.pixelSpacing = getattr(dcm_first, 'PixelSpacing')
         self.firstSlice_IOP = np.array(getattr(dcm_first, 'ImageOrientationPatient'))
         self.firstSlice_IPP = np.array(getattr(dcm_first, 'ImagePositionPatient'))
@@ -308,46 +469,67 @@ class Siemens_BuildNifti():
         """
         imageMatrix = None
         affine = None
+        rasOrnt = None
+        rescale = None
         TR = None
 
         # make dicomFiles store the full path
         dicomFiles = [join(self.seriesDir, f) for f in dicomFiles]
 
-        ### Loop over all dicom mosaic files
+        ### Loop over all dicom mosaic files. The files are read in parallel
+        # (see _readDicoms()), and handed back here in order as they're ready
         nVols = len(dicomFiles)
-        for mosaic_dcm_fname in dicomFiles:
-            ### Parse the mosaic image into a 3D volume
-            # we use the nibabel mosaic_to_nii() method which does a lot of the
-            # heavy-lifting of extracting slices, arranging in a 3D array, and
-            # grabbing the affine
-            dcm = pydicom.dcmread(mosaic_dcm_fname)     # create dicom object
-
+        for dcm in _readDicoms(dicomFiles):
             # for mosaic files, the instanceNumber tag will correspond to the
             # volume number (using a 1-based indexing, so subtract by 1)
             volIdx = dcm.InstanceNumber - 1
 
-            # convert the dicom object to nii
-            thisVol = dicomreaders.mosaic_to_nii(dcm)
-
-            # convert to RAS+
-            thisVol_RAS = nib.as_closest_canonical(thisVol)
+            # The mosaic layout and the affine are the same for every
+            # volume in the series, so only get them from the first one.
+            # We use the nibabel mosaic_to_nii() method which does the
+            # heavy-lifting of reading the slice dims, number of slices,
+            # and affine out of the Siemens private tags. From the affine,
+            # work out the axis flips/swaps that take each volume to RAS+
+            # (the same ones that nib.as_closest_canonical() would apply).
+            # The rescale slope/intercept are stored too, so that the voxel
+            # values come out the same as they would from mosaic_to_nii()
+            if rasOrnt is None:
+                firstVol = dicomreaders.mosaic_to_nii(dcm)
+                sliceDims = firstVol.shape[:2]
+                nSlicesPerVol = firstVol.shape[2]
+                rasOrnt = nib.orientations.io_orientation(firstVol.affine)
+                affine = firstVol.affine.dot(
+                    nib.orientations.inv_ornt_aff(rasOrnt, firstVol.shape))
+                rescale = _getRescale(dcm)
+
+            ### Parse the mosaic image into a 3D volume, reorder to RAS+, and scale
+            thisVol_RAS = nib.orientations.apply_orientation(
+                _demosaic(_getPixelArray(dcm), sliceDims, nSlicesPerVol),
+                rasOrnt)
+            thisVol_RAS = _applyRescale(thisVol_RAS, *rescale)
 
             if TR is None:
                 TR = dcm.RepetitionTime / 1000
 
-            # construct the imageMatrix if it hasn't been made yet
+            # construct the imageMatrix if it hasn't been made yet. It's
+            # left uninitialized, since each volume gets overwritten in
+            # full (keep track of which ones, in case any are missing).
+            # Fortran order keeps each volume in one contiguous block
+            # (and matches the order nifti files are written in). The
+            # dtype follows the volume (floats, if the data are scaled)
             if imageMatrix is None:
-                imageMatrix = np.zeros(shape=(thisVol_RAS.shape[0],
+                imageMatrix = np.empty(shape=(thisVol_RAS.shape[0],
                                               thisVol_RAS.shape[1],
                                               thisVol_RAS.shape[2],
-                                              nVols), dtype=np.uint16)
-
-            # construct the affine if it isn't made yet
-            if affine is None:
-                affine = thisVol_RAS.affine
+                                              nVols), dtype=thisVol_RAS.dtype, order='F')
+                filledVols = np.zeros(nVols, dtype=bool)
 
             # Add this data to the image matrix
-            imageMatrix[:, :, :, volIdx] = thisVol_RAS.get_fdata()
+            imageMatrix[:, :, :, volIdx] = thisVol_RAS
+            filledVols[volIdx] = True
+
+        # zero out any volumes that didn't have a mosaic file
+        imageMatrix[:, :, :, ~filledVols] = 0
 
         ### Build a Nifti object
         funcImage = nib.Nifti1Image(imageMatrix, affine=affine)
@@ -401,7 +583,7 @@ class Siemens_BuildNifti():
         voxTranslations = self.firstSlice_IPP * np.array([-1, -1, 1])
 
         ### Assemble the affine matrix
-        affine = np.matrix([
+        affine = np.array([
             [rowAxis_orient[0] * voxSize_row, colAxis_orient[0] * voxSize_col, slAxis_orient[0], voxTranslations[0]],
             [rowAxis_orient[1] * voxSize_row, colAxis_orient[1] * voxSize_col, slAxis_orient[1], voxTranslations[1]],
             [rowAxis_orient[2] * voxSize_row, colAxis_orient[2] * voxSize_col, slAxis_orient[2], voxTranslations[2]],
@@ -430,8 +612,9 @@ class Siemens_BuildNifti():
             either 'anat' or 'func' depending on scan type stored in dicom tag
 
         """
-        # read the dicom file
-        dcm = pydicom.dcmread(join(self.seriesDir, dicomFile), stop_before_pixels=1)
+        # read the dicom file. Only the one tag is needed, so skip the rest
+        dcm = pydicom.dcmread(join(self.seriesDir, dicomFile), stop_before_pixels=1,
+                              specific_tags=['MRAcquisitionType'])
 
         if getattr(dcm, 'MRAcquisitionType') == '3D':
             scanType = 'anat'
@@ -504,18 +687,26 @@ class Siemens_monitorSessionDir(Thread):
         self.dicomQ = dicomQ                # queue to store dicom mosaic files
         self.alive = True                   # thread status
         self.numMosaicsAdded = 0            # counter to keep track of # mosaics
-        self.queued_mosaic_files = set()    # empty set to store names of queued mosaic
+        self.queued_mosaic_files = set()    # empty set to store file names of queued mosaics
+
+        # file name pattern matching all mosaic files for the current series.
+        # Use with fullmatch(), so partially copied/temporary files (e.g.
+        # '.dcm.part' or '.dcm~') are never picked up
+        self.seriesMosaicPattern = re.compile(r'\d{3}_%06d_\d{6}\.dcm' % int(self.seriesNum))
 
     def run(self):
         # function that runs while the Thread is still alive
         while self.alive:
 
-            # create a set of all mosaic files with the current series num
-            #currentMosaics = set(os.listdir(self.seriesDir))
-            currentMosaics = set(glob.glob(join(self.sessionDir, ('*_' + str(self.seriesNum).zfill(6) + '_*.dcm'))))
-
-            # grab only the ones that haven't already been added to the queue
-            newMosaics = [f for f in currentMosaics if f not in self.queued_mosaic_files]
+            # find all mosaic files with the current series num that haven't
+            # already been added to the queue, in volume order (the file names
+            # are fixed-width). Files that were already queued are skipped
+            # before the pattern match, so each poll only does real work for
+            # the new ones. Only the (interned) file names are stored, which
+            # keeps hashing cheap as the set of queued files grows over the run
+            newMosaics = sorted(sys.intern(entry.name) for entry in os.scandir(self.sessionDir)
+                                if entry.name not in self.queued_mosaic_files
+                                and self.seriesMosaicPattern.fullmatch(entry.name))
 
             # loop over each of the new mosaic files, add each to queue
             for f in newMosaics:
@@ -531,7 +722,7 @@ class Siemens_monitorSessionDir(Thread):
             self.numMosaicsAdded += len(newMosaics)
 
             # now update the set of mosaics added to the queue
-            self.queued_mosaic_files.update(set(newMosaics))
+            self.queued_mosaic_files.update(newMosaics)
 
             # pause
             time.sleep(self.interval)
@@ -551,8 +742,8 @@ class Siemens_processMosaic(Thread):
     This class will run in a separate thread. While running, it will pull
     'tasks' off of the queue and process each one. Processing each task
     involves reading the mosaic file, converting it to a 3D Nifti object,
-    reordering it to RAS+, and then sending the volume out over the
-    pynealSocket
+    reordering it to RAS+, and then handing the volume off to a
+    `Siemens_sendVolumes` thread to be sent out over the pynealSocket
 
     """
     def __init__(self, dicomQ, pynealSocket, interval=.2):
@@ -569,8 +760,8 @@ class Siemens_processMosaic(Thread):
             headers to Pyneal during the real-time scan.
             See also: general_utils.create_pynealSocket()
         interval : float, optional
-            time, in seconds, to wait before repolling the queue to see if
-            there are any new file names to process
+            time, in seconds, to wait on the queue for a new file name before
+            checking if the thread is still alive
 
         """
         # start the threat upon creation
@@ -581,54 +772,99 @@ class Siemens_processMosaic(Thread):
 
         # initialize class parameters
         self.dicomQ = dicomQ
-        self.interval = interval        # interval between polling queue for new files
+        self.interval = interval        # timeout when waiting on the queue for new files
+        self.fileCopyTimeout = 5        # max time, in seconds, to wait for a file to finish copying
+        self.senderStopTimeout = 1      # max time, in seconds, to wait for the volume sender to stop
         self.alive = True
         self.pynealSocket = pynealSocket
         self.totalProcessed = 0         # counter for total number of slices processed
 
+        # mosaic layout, the reorientation to RAS+ (and the resulting
+        # affine), and the pixel value scaling, worked out from the first
+        # volume of the series
+        self.seriesUID = None
+        self.sliceDims = None
+        self.nSlicesPerVol = None
+        self.rasOrnt = None
+        self.rasAffine = None
+        self.rescale = None
+
+        # header fields that are the same for every volume in the series
+        # (dtype, shape, affine, TR); built from the first processed volume
+        self.volHeaderTemplate = None
+
+        # processed volumes are handed off to a separate thread for sending,
+        # so that the next mosaic can be decoded while waiting on Pyneal to
+        # respond. The queue is bounded so that a stalled socket will hold up
+        # processing instead of letting volumes pile up in memory
+        self.sendQ = Queue(maxsize=4)
+        self.volSender = Siemens_sendVolumes(self.sendQ, pynealSocket, interval=interval)
+
     def run(self):
         self.logger.debug('Siemens_processMosaic started')
 
+        # start the thread that sends volumes out over the pynealSocket
+        self.volSender.start()
+
         # function to run on loop
         while self.alive:
 
-            # if there are any mosaic files in the queue, process them
-            if not self.dicomQ.empty():
-                numMosaicsInQueue = self.dicomQ.qsize()
-
-                # loop through all mosaics currently in queue & process
-                for m in range(numMosaicsInQueue):
-                    # retrieve file name from queue
-                    mosaic_dcm_fname = self.dicomQ.get(True, 2)
-
-                    # ensure the file has copied completely
-                    file_size = 0
-                    while True:
-                        file_info = os.stat(mosaic_dcm_fname)
-                        if file_info.st_size == 0 or file_info.st_size > file_size:
-                            file_size = file_info.st_size
-                        else:
-                            break
-
-                    # process this mosaic
-                    self.processMosaicFile(mosaic_dcm_fname)
-
-                    # complete this task, thereby clearing it from the queue
-                    self.dicomQ.task_done()
+            # if the sender has stopped (e.g. Pyneal signaled the last
+            # volume), there is nothing left to do
+            if not self.volSender.alive:
+                self.stop()
+                break
+
+            # wait for the next mosaic file to arrive in the queue. This wakes
+            # up as soon as a file is added, rather than on the next poll
+            try:
+                mosaic_dcm_fname = self.dicomQ.get(True, self.interval)
+            except Empty:
+                continue
+
+            # ensure the file has copied completely. A file that is already
+            # complete passes on the first comparison; otherwise, pause
+            # briefly between checks instead of spinning on os.stat. Keep
+            # waiting for as long as the file is still growing. If it stalls
+            # (still empty, or no bigger) for fileCopyTimeout, stop waiting
+            # so the files behind it aren't held up
+            file_size = os.stat(mosaic_dcm_fname).st_size
+            lastGrowth = time.time()
+            fileCopied = False
+            while time.time() - lastGrowth < self.fileCopyTimeout:
+                file_info = os.stat(mosaic_dcm_fname)
+                if file_info.st_size > file_size:
+                    file_size = file_info.st_size
+                    lastGrowth = time.time()
+                    time.sleep(.005)
+                elif file_info.st_size == 0:
+                    time.sleep(.005)
+                else:
+                    fileCopied = True
+                    break
+
+            # process this mosaic. A stalled file is put back on the end of the
+            # queue to be checked again, rather than dropping the volume
+            if fileCopied:
+                self.processMosaicFile(mosaic_dcm_fname)
 
                 # log how many were processed
-                self.totalProcessed += numMosaicsInQueue
-                self.logger.debug('Processed {} tasks from the queue ({} total)'.format(numMosaicsInQueue, self.totalProcessed))
+                self.totalProcessed += 1
+                self.logger.debug('Processed 1 task from the queue ({} total)'.format(self.totalProcessed))
+            else:
+                self.logger.warning('{} has not finished copying after {} s; will try again'.format(
+                    mosaic_dcm_fname, self.fileCopyTimeout))
+                self.dicomQ.put(mosaic_dcm_fname)
 
-            # pause for a bit
-            time.sleep(self.interval)
+            # complete this task, thereby clearing it from the queue
+            self.dicomQ.task_done()
 
     def processMosaicFile(self, mosaic_dcm_fname):
         """ Process a given mosaic dicom file
 
         This method will read the dicom mosaic file. Convert to a nifti object
         that will provide the 3D voxel array for this mosaic. Reorder to RAS+,
-        and then send to the pynealSocket
+        and then place on the queue to be sent to the pynealSocket
 
         Parameters
         ----------
@@ -639,32 +875,142 @@ class Siemens_processMosaic(Thread):
         ### Figure out the volume index for this mosaic by reading
         # the field from the file name itself
         mosaicFile_root, mosaicFile_name = os.path.split(mosaic_dcm_fname)
-        volIdx = int(Siemens_mosaicVolumeNumberField.search(mosaicFile_name).group(0)) - 1
+        assert mosaicFile_name[3] == '_' and mosaicFile_name[10] == '_', \
+            'Unexpected mosaic file name format: {}'.format(mosaicFile_name)
+        volIdx = int(mosaicFile_name[Siemens_mosaicVolumeNumberField]) - 1
         self.logger.info('Volume {} processing'.format(volIdx))
 
-        ### Parse the mosaic image into a 3D volume
-        # we use the nibabel mosaic_to_nii() method which does a lot of the
-        # heavy-lifting of extracting slices, arranging in a 3D array, and
-        # grabbing the affine
         dcm = pydicom.dcmread(mosaic_dcm_fname)     # create dicom object
-        thisVol = dicomreaders.mosaic_to_nii(dcm)   # convert to nifti
 
-        # convert to RAS+
-        thisVol_RAS = nib.as_closest_canonical(thisVol)
+        # The mosaic layout and the affine are the same for every volume in
+        # the series, so only get them from the first volume (or if the
+        # series changes). We use the nibabel mosaic_to_nii() method which
+        # does the heavy-lifting of reading the slice dims, number of slices,
+        # and affine out of the Siemens private tags. From the affine, work
+        # out the axis flips/swaps that take the volume to RAS+ (the same
+        # ones that nib.as_closest_canonical() would apply). The rescale
+        # slope/intercept are stored too, so that the voxel values come out
+        # the same as they would from mosaic_to_nii()
+        if dcm.SeriesInstanceUID != self.seriesUID:
+            firstVol = dicomreaders.mosaic_to_nii(dcm)
+            self.sliceDims = firstVol.shape[:2]
+            self.nSlicesPerVol = firstVol.shape[2]
+            self.rasOrnt = nib.orientations.io_orientation(firstVol.affine)
+            self.rasAffine = firstVol.affine.dot(
+                nib.orientations.inv_ornt_aff(self.rasOrnt, firstVol.shape))
+            self.rescale = _getRescale(dcm)
+            self.seriesUID = dcm.SeriesInstanceUID
+            self.volHeaderTemplate = None
+
+        ### Parse the mosaic image into a 3D volume, reorder to RAS+, and scale
+        thisVol_RAS_data = nib.orientations.apply_orientation(
+            _demosaic(_getPixelArray(dcm), self.sliceDims, self.nSlicesPerVol),
+            self.rasOrnt)
+        thisVol_RAS_data = _applyRescale(thisVol_RAS_data, *self.rescale)
+
+        # get the data as a contiguous array (required for ZMQ). Unscaled data
+        # keeps its native dtype; scaled data is sent as floats
+        thisVol_RAS_data = np.ascontiguousarray(thisVol_RAS_data)
+
+        ### Create a header with metadata info. Everything but the volIdx is
+        # fixed for the series, so the affine only gets serialized once
+        if self.volHeaderTemplate is None:
+            self.volHeaderTemplate = {
+                'dtype': str(thisVol_RAS_data.dtype),
+                'shape': thisVol_RAS_data.shape,
+                'affine': json.dumps(self.rasAffine.tolist()),
+                'TR': str(dcm.RepetitionTime / 1000)}
+        volHeader = {'volIdx': volIdx, **self.volHeaderTemplate}
+
+        ### Hand the voxel array and header off to be sent to the pynealSocket.
+        # If the queue is full, keep retrying only as long as both threads are
+        # still running; once the sender has stopped (e.g. Pyneal signaled the
+        # last volume) nothing will drain the queue, so drop the volume
+        while self.alive and self.volSender.alive:
+            try:
+                self.sendQ.put((volHeader, thisVol_RAS_data), True, self.interval)
+                break
+            except Full:
+                continue
+        else:
+            self.logger.debug('Volume {} not sent; volume sender has stopped'.format(volIdx))
 
-        # get the data as a contiguous array (required for ZMQ)
-        thisVol_RAS_data = np.ascontiguousarray(thisVol_RAS.get_fdata())
+    def stop(self):
+        """ set the `alive` flag to False, stopping the thread and the
+        volume sending thread along with it
+        """
+        self.alive = False
+        self.volSender.stop()
+
+        # wait for the sender to finish, but not forever; the sender checks
+        # its `alive` flag at least every `interval` seconds, even while
+        # waiting on a reply from Pyneal
+        if self.volSender.is_alive():
+            self.volSender.join(timeout=self.senderStopTimeout)
+            if self.volSender.is_alive():
+                self.logger.warning('Volume sender did not stop within {} s'.format(
+                    self.senderStopTimeout))
+
+
+class Siemens_sendVolumes(Thread):
+    """ Class to send processed volumes out over the pynealSocket.
+
+    This class will run in a separate thread. While running, it will pull
+    processed volumes (header and voxel array) off of the queue filled by
+    `Siemens_processMosaic` and send each one to Pyneal, waiting for Pyneal to
+    respond before sending the next. Running this separately from the mosaic
+    processing allows the next volume to be decoded while the current one is
+    in transit
+
+    """
+    def __init__(self, sendQ, pynealSocket, interval=.2):
+        """ Initialize the class
 
-        ### Create a header with metadata info
-        volHeader = {
-            'volIdx': volIdx,
-            'dtype': str(thisVol_RAS_data.dtype),
-            'shape': thisVol_RAS_data.shape,
-            'affine': json.dumps(thisVol_RAS.affine.tolist()),
-            'TR': str(dcm.RepetitionTime / 1000)}
+        Parameters
+        ----------
+        sendQ : object
+            instance of python queue class that will store tuples of
+            (volHeader, voxelArray) for each processed volume. This class will
+            pull items from that queue.
+        pynealSocket : object
+            instance of ZMQ style socket that will be used to communicate with
+            Pyneal. This class will use this socket to send image data and
+            headers to Pyneal during the real-time scan.
+            See also: general_utils.create_pynealSocket()
+        interval : float, optional
+            time, in seconds, to wait on the queue for a new volume before
+            checking if the thread is still alive
+
+        """
+        # start the thread upon creation
+        Thread.__init__(self)
+
+        # set up logger
+        self.logger = logging.getLogger(__name__)
+
+        # initialize class parameters
+        self.sendQ = sendQ
+        self.interval = interval
+        self.alive = True
+        self.pynealSocket = pynealSocket
+
+    def run(self):
+        self.logger.debug('Siemens_sendVolumes started')
+
+        try:
+            while self.alive:
+                # wait for the next processed volume to arrive
+                try:
+                    volHeader, voxelArray = self.sendQ.get(True, self.interval)
+                except Empty:
+                    continue
 
-        ### Send the voxel array and header to the pynealSocket
-        self.sendVolToPynealSocket(volHeader, thisVol_RAS_data)
+                self.sendVolToPynealSocket(volHeader, voxelArray)
+                self.sendQ.task_done()
+        finally:
+            # make sure the processing thread can tell this thread is gone,
+            # even if sending failed (e.g. a ZMQ error)
+            self.alive = False
 
     def sendVolToPynealSocket(self, volHeader, voxelArray):
         """ Send the volume data to Pyneal
@@ -682,9 +1028,15 @@ class Siemens_processMosaic(Thread):
         """
         self.logger.debug('TO pynealSocket: vol {}'.format(volHeader['volIdx']))
 
-        ### Send data out the socket, listen for response
+        ### Send data out the socket, listen for response. Poll for the
+        # response, rather than blocking on it, so that this thread can still
+        # be stopped if Pyneal never replies
         self.pynealSocket.send_json(volHeader, zmq.SNDMORE)  # header as json
         self.pynealSocket.send(voxelArray, flags=0, copy=False, track=False)
+        while not self.pynealSocket.poll(timeout=int(self.interval * 1000)):
+            if not self.alive:
+                self.logger.debug('No response from pynealSocket for vol {}'.format(volHeader['volIdx']))
+                return
         pynealSocketResponse = self.pynealSocket.recv_string()
 
         # log the success
@@ -709,6 +1061,7 @@ def Siemens_launch_rtfMRI(scannerSettings, scannerDirs):
         - creating a Queue to store newly arriving DICOM files
         - start a separate thread to monitor the new series appearing
         - start a separate thread to process DICOMs that are in the Queue
+        - start a separate thread to send processed volumes to Pyneal
 
     """
     # Create a reference to the logger. This assumes the logger has already
@@ -756,6 +1109,6 @@ def Siemens_launch_rtfMRI(scannerSettings, scannerDirs):
 
     # create an instance of the class that will grab mosaic dicoms
     # from the queue, reformat the data, and pass over the socket
-    # to pyneal. Start the thread going
+    # to pyneal (via its own sending thread). Start the thread going
     mosaicProcessor = Siemens_processMosaic(dicomQ, pynealSocket)
     mosaicProcessor.start()
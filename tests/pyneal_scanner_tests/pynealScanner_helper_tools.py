@@ -6,6 +6,7 @@ import sys
 from threading import Thread
 import time
 
+import numpy as np
 import zmq
 
 import yaml
@@ -1,12 +1,16 @@
 import os
 from os.path import join
 import sys
+import glob
 import shutil
 import threading
 from queue import Queue
 import subprocess
 import time
 
+import numpy as np
+import pydicom
+from nibabel.nicom import dicomreaders
 import zmq
 import pytest
 
@@ -61,6 +65,82 @@ class Test_Siemens_utils():
         """
         pass
 
+    def test_getPixelArray(self):
+        """ test Siemens_utils._getPixelArray
+
+        The fast path that reads the pixel bytes directly should match the
+        array returned by pydicom's `pixel_array`
+        """
+        for dcm_fname in sorted(glob.glob(join(paths['Siemens_funcDir'], '*.dcm'))):
+            dcm = pydicom.dcmread(dcm_fname)
+            pixelArray = Siemens_utils._getPixelArray(dcm)
+
+            assert pixelArray.dtype == dcm.pixel_array.dtype
+            assert np.array_equal(pixelArray, dcm.pixel_array)
+
+    def test_demosaic(self):
+        """ test Siemens_utils._demosaic
+
+        Splitting the mosaic into slices should produce the same volume as
+        nibabel's `mosaic_to_nii`
+        """
+        for dcm_fname in sorted(glob.glob(join(paths['Siemens_funcDir'], '*.dcm'))):
+            dcm = pydicom.dcmread(dcm_fname)
+            mosaicVol = dicomreaders.mosaic_to_nii(dcm)
+            thisVol = Siemens_utils._demosaic(Siemens_utils._getPixelArray(dcm),
+                                              mosaicVol.shape[:2],
+                                              mosaicVol.shape[2])
+
+            assert thisVol.shape == mosaicVol.shape
+            assert np.array_equal(thisVol, mosaicVol.get_fdata())
+
+    def test_applyRescale(self):
+        """ test Siemens_utils._getRescale & Siemens_utils._applyRescale
+
+        For a mosaic with a non-identity rescale slope/intercept, the scaled
+        volume should match nibabel's `mosaic_to_nii`
+        """
+        dcm_fname = sorted(glob.glob(join(paths['Siemens_funcDir'], '*.dcm')))[0]
+        dcm = pydicom.dcmread(dcm_fname)
+        dcm.RescaleSlope = 2
+        dcm.RescaleIntercept = -4096
+        mosaicVol = dicomreaders.mosaic_to_nii(dcm)
+
+        rescale = Siemens_utils._getRescale(dcm)
+        thisVol = Siemens_utils._applyRescale(
+            Siemens_utils._demosaic(Siemens_utils._getPixelArray(dcm),
+                                    mosaicVol.shape[:2],
+                                    mosaicVol.shape[2]),
+            *rescale)
+
+        assert rescale == (2.0, -4096.0)
+        assert thisVol.dtype == np.float64
+        assert np.array_equal(thisVol, mosaicVol.get_fdata())
+
+    def test_readDicoms(self):
+        """ test Siemens_utils._readDicoms
+
+        Datasets should come back in the same order as the list of files, even
+        when there are more files than reading threads
+        """
+        dicomFiles = sorted(glob.glob(join(paths['Siemens_funcDir'], '*.dcm'))) * 20
+        dicoms = list(Siemens_utils._readDicoms(dicomFiles))
+
+        assert len(dicoms) == len(dicomFiles)
+        for dcm, dcm_fname in zip(dicoms, dicomFiles):
+            assert dcm.filename == dcm_fname
+
+    def test_seriesMosaicPattern(self):
+        """ test the file name pattern used by Siemens_utils.Siemens_monitorSessionDir
+
+        Only complete mosaic file names for the current series should match
+        """
+        scanWatcher = Siemens_utils.Siemens_monitorSessionDir(paths['Siemens_funcDir'], '000013', Queue())
+        assert scanWatcher.seriesMosaicPattern.fullmatch('001_000013_000001.dcm')
+        for fName in ['001_000013_000001.dcm.part', '001_000013_000001xdcm',
+                      '001_000013_000001.dcm~', '001_000014_000001.dcm']:
+            assert not scanWatcher.seriesMosaicPattern.fullmatch(fName)
+
     def test_Siemens_monitorSessionDir_and_Siemens_processMosaic(self):
         """ test Siemens_utils.Siemens_monitorSessionDir & Siemens_utils.Siemens_processMosaic
 
@@ -99,13 +179,19 @@ class Test_Siemens_utils():
         mosaicProcessor.start()
 
         # simulate a scan by copying new data into the session dir
-        fakeNewSiemensSeries(seriesNum, nVols=3)
+        fakeNewSiemensSeries(seriesNum, nVols=nVols)
 
-        # assuming it didn't crash, cancel the bg thread and delete new dir
+        # wait for the simulated pyneal socket to receive every volume
+        recvSocket.join(timeout=10)
+        receivedVols = recvSocket.receivedVols
+
+        # cancel the bg threads and delete new dir
         scanWatcher.stop()
         mosaicProcessor.stop()
         recvSocket.stop()
-        removeFakeSiemensSeries(seriesNum, nVols=3)
+        removeFakeSiemensSeries(seriesNum, nVols=nVols)
+
+        assert receivedVols == nVols
 
 
 @pytest.mark.skip(reason="we want the test methods to call this, not pytest itself")